@@ -0,0 +1,32 @@
+from google.genai import types
+from .RateLimiter import MODEL_CALL_LIMITER
+
+# ============================================================================
+# Retry Configuration
+# ============================================================================
+RETRY_MAX_ATTEMPTS = 3
+RETRY_INITIAL_DELAY = 0.1
+RETRY_MAX_DELAY = 10.0
+RETRY_MULTIPLIER = 2.0
+
+# Retries happen inside the genai client, which re-sends the request with exponential backoff
+# and jitter on retryable statuses (429, 5xx, timeouts). An on_model_error_callback can't do this:
+# ADK re-raises the model error whenever the callback returns None.
+# Pass with the model, e.g. Gemini(model=..., retry_options=MODEL_RETRY_OPTIONS).
+MODEL_RETRY_OPTIONS = types.HttpRetryOptions(
+    attempts=RETRY_MAX_ATTEMPTS,
+    initial_delay=RETRY_INITIAL_DELAY,
+    max_delay=RETRY_MAX_DELAY,
+    exp_base=RETRY_MULTIPLIER,
+)
+
+# ============================================================================
+# Rate Limiting Callback
+# ============================================================================
+async def rate_limit_callback(callback_context, llm_request):
+    """
+    Throttle requests to avoid hitting quota limits.
+    Only waits when the model call rate would exceed the configured limit, and yields to the
+    event loop while waiting so other sessions and sub-agents keep running.
+    """
+    await MODEL_CALL_LIMITER.acquire()
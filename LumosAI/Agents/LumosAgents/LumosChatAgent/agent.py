@@ -1,73 +1,17 @@
-import time
 from google.adk.agents import LlmAgent
+from google.adk.models import Gemini
 from google.adk.apps import App
-from .GoogleTools import google_search_agent_tool, url_context_agent_tool
+from .Callbacks import MODEL_RETRY_OPTIONS, rate_limit_callback
+from .GoogleTools import google_web_agent_tool
 from .MyTools import lumosdb_toolset, lumostrade_toolset
-
-# ============================================================================
-# Retry Configuration
-# ============================================================================
-RETRY_MAX_ATTEMPTS = 3
-RETRY_INITIAL_DELAY = 0.1
-RETRY_MAX_DELAY = 10.0
-RETRY_MULTIPLIER = 2.0
-
-# ============================================================================
-# Rate Limiting Callback
-# ============================================================================
-def rate_limit_callback(callback_context, llm_request):
-    """
-    Throttle requests to avoid hitting quota limits.
-    Adds a small delay between model calls.
-    """
-    time.sleep(0.1)
-
-def retry_on_error_callback(callback_context, llm_request, error=None, exception=None, **kwargs):
-    """
-    Handle model errors with exponential backoff retry logic.
-    Uses callback_context.state to track retry attempts and delays.
-    """
-    # Use either error or exception parameter
-    err = error or exception
-    
-    # Initialize retry tracking in state if not present
-    request_id = id(llm_request)
-    retry_key = f"retry_count_{request_id}"
-    delay_key = f"retry_delay_{request_id}"
-    
-    if retry_key not in callback_context.state:
-        callback_context.state[retry_key] = 0
-        callback_context.state[delay_key] = RETRY_INITIAL_DELAY
-    
-    retry_count = callback_context.state[retry_key]
-    current_delay = callback_context.state[delay_key]
-    
-    # Check if we've exceeded max attempts
-    if retry_count >= RETRY_MAX_ATTEMPTS - 1:
-        # Clean up state and let the error propagate
-        del callback_context.state[retry_key]
-        del callback_context.state[delay_key]
-        return None  # Re-raise the exception
-    
-    # Increment retry count and calculate next delay
-    callback_context.state[retry_key] = retry_count + 1
-    
-    # Sleep with exponential backoff
-    time.sleep(current_delay)
-    
-    # Calculate next delay with exponential backoff, capped at max_delay
-    next_delay = min(current_delay * RETRY_MULTIPLIER, RETRY_MAX_DELAY)
-    callback_context.state[delay_key] = next_delay
-    
-    # Return None to retry the request
-    return None
+from .Prompts import CHAT_INSTRUCTION
 
 # ============================================================================
 # Agent Definition
 # ============================================================================
 root_agent = LlmAgent(
     name='LumosChat',
-    model='gemini-2.5-flash', 
+    model=Gemini(model='gemini-2.5-flash', retry_options=MODEL_RETRY_OPTIONS),
     description=(
         'Agent to provide tools and information for examining the performance of a stock portfolio over time, '
         'including current and historical account balances, trade performance, specific stock quotes, and '
@@ -78,58 +22,13 @@ root_agent = LlmAgent(
         'and Charles Schwab accounts.'
     ),
     sub_agents=[],
-    instruction=(
-        """Purpose and scope:
-- Provide useful tools and information for analyzing a single user’s stock portfolio over time.
-- Focus on balances, trade performance, quotes, and historical order analysis.
-About Lumos:
-- If the user asks what Lumos is or wants more information about the platform, provide a brief description explaining it's an open source trade visualization and analysis platform created by Mark Isham used to explore account performance, trades, and portfolio history, with AI-assisted workflows for questions and reporting. It aggregates data from multiple brokers (like E*TRADE and Charles Schwab).
-- Direct them to the GitHub repository for more details: https://github.com/marktisham/LumosTrade
-Definitions:
-- Order: a specific broker transaction for a specific account at a point in time.
-- Trade: one or more orders for the same symbol in the same account over time; closed when open quantity is zero.
-- Broker: a third party service that places stock orders on behalf of the user (e.g., ETrade, Charles Schwab).
-- Account: a specific user account at a broker.
-
-Tool priority:
-- Use Lumos tools first when applicable.
-- Use Google Search and/or URL context tools only when Lumos tools do not suffice.
-- If the get_quotes tool is used to get a stock price and returns no data or fails, automatically fall back to using Google Search to find the current stock price.
-- If Google Search is used to answer, explicitly mention in the response that the result is from google search.
-
-Response guidance:
-- Provide clear and detailed answers. 
-- Be cheerful and upbeat without overly sycophantic.
-- If the user’s request is ambiguous, bias toward financial/stock market context and ask a clarifying question when needed.
-- Be proactive and eager to offer follow-up actions — suggest next steps and recommend which Lumos or external tools could be run to gather more data or perform analysis (for example: `expected-moves`, `search-trades`, `trade-history`, `search-orders`, Google Search).
-- When appropriate, offer a short summary and an actionable next step (for example, "Would you like me to run `expected-moves` for this symbol?").
-- Fill in gaps in data using google search when appropriate, but always prefer Lumos tools first. Indicate when responses come from google search in your response as a disclaimer.
-- "Refresh" tools can be expensive and time consuming to run. If there's ambiguity, bias to the tool that is not doing a refresh.
-- CHARTS AND VISUALIZATIONS: If the user asks for charts, graphs, or any visualizations (other than tables), politely explain that you cannot create those and suggest they try Lumos Conjure instead, which is designed for creating visual charts and graphs.
-- TABLE FORMATTING: If the response has more than 1 record, display it in a professional dark-themed table.
-    * DEFAULT: Use the normal (default) sizing — apply `class='lumos-dark-table'` to the `<table>` element.
-    * COMPACT OPTION: If the user explicitly requests a denser view (e.g., says "compact", "dense", or "show a compact table"), apply `class='lumos-dark-table lumos-dark-table--compact'` instead.
-    * PERFORMANCE RULE: Use short helper classes `l`, `c`, `p`, `n` for alignment and coloring (`l` = left, `c` = center, `p` = positive/gain, `n` = negative/loss).
-    * THEME: Use a dark, professional aesthetic with high contrast.
-    * ALIGNMENT: Use class='l' for text headers/cells and class='c' for numeric headers/cells.
-    * COLOR: Apply class='p' for gains and class='n' for losses.
-    * Do not wrap output in markdown code blocks.
-
-Time and locale:
-- User is always in US Eastern time. Always display dates and time in US Eastern time in a concise format.
-- If a question asks for a date or time and it is unknown, use Google Search tool as an assistant to determine the appropriate date or time, in US Eastern/New York time.
-
-Error handling:
-- If you encounter errors or fail to get a response, inform the user that they may be hitting Vertex AI quota limits and suggest waiting a moment before trying again."""
-    ),
+    instruction=CHAT_INSTRUCTION,
     tools=[
         lumosdb_toolset,
         lumostrade_toolset,
-        google_search_agent_tool,
-        url_context_agent_tool,
+        google_web_agent_tool,
     ],
     before_model_callback=[rate_limit_callback],
-    on_model_error_callback=[retry_on_error_callback],
 )
 
 app = App(root_agent=root_agent, name="LumosChatAgent")
\ No newline at end of file
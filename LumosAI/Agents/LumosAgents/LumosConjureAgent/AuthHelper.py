@@ -1,8 +1,120 @@
-from google.auth.exceptions import DefaultCredentialsError
+from google.auth import impersonated_credentials
+from google.auth.credentials import Credentials
+from google.auth.exceptions import DefaultCredentialsError, RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2 import id_token
+import calendar
 import google.auth
+import logging
 import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# ID token credentials cached per audience, alongside their expiry (epoch seconds).
+# Tokens are reused until they are within _TOKEN_EXPIRY_MARGIN_SECONDS of expiring.
+_TOKEN_EXPIRY_MARGIN_SECONDS = 60
+_token_cache: dict[str, tuple[Credentials, float]] = {}
+_cache_lock = threading.Lock()
+
+# A background thread refreshes cached tokens this far ahead of expiry (before the request
+# path would consider them stale), so callers don't block on a refresh once an hour.
+_PREEMPTIVE_REFRESH_SECONDS = 2 * _TOKEN_EXPIRY_MARGIN_SECONDS
+_REFRESHER_IDLE_SECONDS = 60
+_REFRESHER_RETRY_SECONDS = 30
+_refresher_started = False
+
+# When running locally with impersonation, ADC (the developer's gcloud login) is the
+# source credential used to mint ID tokens on behalf of AGENT_SERVICE_ACCOUNT.
+_IMPERSONATION_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+_agent_service_account = os.environ.get("AGENT_SERVICE_ACCOUNT")
+
+# Shared HTTP transport for all token requests, and ADC resolved once on first use.
+_AUTH_REQ = Request()
+_default_credentials: tuple[Credentials, str | None] | None = None
+_default_lock = threading.Lock()
+
+
+def _get_default() -> tuple[Credentials, str | None]:
+    """Return the cached (credentials, project) from google.auth.default()."""
+    global _default_credentials
+    with _default_lock:
+        if _default_credentials is None:
+            _default_credentials = google.auth.default()
+        return _default_credentials
+
+
+def _create_id_token_credentials(audience_url: str, impersonate: bool) -> Credentials:
+    """Build (but don't refresh) ID token credentials for the given audience."""
+    if impersonate:
+        source_credentials, _ = _get_default()
+        target_credentials = impersonated_credentials.Credentials(
+            source_credentials=source_credentials,
+            target_principal=_agent_service_account,
+            target_scopes=_IMPERSONATION_SCOPES,
+        )
+        return impersonated_credentials.IDTokenCredentials(
+            target_credentials,
+            target_audience=audience_url,
+            include_email=True,
+        )
+
+    # Default behavior for Cloud Run or when impersonation is not configured.
+    # This does its own discovery (service-account key file or metadata server), so ADC
+    # doesn't need to be resolved or refreshed first - the access token would go unused.
+    return id_token.fetch_id_token_credentials(audience_url, request=_AUTH_REQ)
+
+
+def _expiry_timestamp(credentials: Credentials) -> float:
+    # expiry is a naive UTC datetime, so convert with timegm rather than .timestamp()
+    return calendar.timegm(credentials.expiry.utctimetuple())
+
+
+def _refresher():
+    """Refresh cached tokens shortly before they expire. Runs forever on a daemon thread."""
+    while True:
+        with _cache_lock:
+            next_expiry = min((expiry for _, expiry in _token_cache.values()), default=None)
+        if next_expiry is None:
+            delay = _REFRESHER_IDLE_SECONDS
+        else:
+            delay = next_expiry - _PREEMPTIVE_REFRESH_SECONDS - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+        with _cache_lock:
+            now = time.time()
+            due = [
+                (audience_url, credentials)
+                for audience_url, (credentials, expiry) in _token_cache.items()
+                if expiry - now <= _PREEMPTIVE_REFRESH_SECONDS
+            ]
+
+        # Refresh outside the lock so callers with valid tokens aren't held up
+        failed = False
+        for audience_url, credentials in due:
+            try:
+                credentials.refresh(_AUTH_REQ)
+            except Exception:
+                # Leave the entry as-is; the request path will retry once it goes stale
+                logger.exception("Background ID token refresh failed for %s", audience_url)
+                failed = True
+                continue
+            with _cache_lock:
+                _token_cache[audience_url] = (credentials, _expiry_timestamp(credentials))
+
+        if failed:
+            time.sleep(_REFRESHER_RETRY_SECONDS)
+
+
+def _start_refresher():
+    """Start the background refresher on first token fetch. Caller must hold _cache_lock."""
+    global _refresher_started
+    if not _refresher_started:
+        _refresher_started = True
+        threading.Thread(target=_refresher, name="IdTokenRefresher", daemon=True).start()
 
 
 # ============================================================================
@@ -12,7 +124,7 @@ def get_id_token_for_service(audience_url: str) -> str:
     """
     Generate a Google Cloud ID token with a specific audience for service-to-service auth.
 
-    IMPORTANT: We use google.oauth2.id_token.fetch_id_token() directly instead of
+    IMPORTANT: We use google.oauth2.id_token.fetch_id_token_credentials() directly instead of
     toolbox_core.auth_methods.get_google_id_token() because the toolbox wrapper caches
     token fetchers by the calling service account rather than by audience. When multiple
     tools run under the same service account (as both LumosDB and LumosTradeTool do),
@@ -20,40 +132,36 @@ def get_id_token_for_service(audience_url: str) -> str:
     when Cloud Run validates the audience claim doesn't match the target service URL.
 
     This direct approach ensures each service gets a token with the correct audience claim.
+    Credentials are cached per audience so the token is only re-minted when it nears expiry,
+    and a background thread refreshes them ahead of that so requests rarely wait on it.
     
     When running locally with service account impersonation, set AGENT_SERVICE_ACCOUNT
     environment variable to enable ID token generation using impersonated credentials.
     """
     try:
-        # When running locally with impersonation, use gcloud to get ID token
-        agent_service_account = os.environ.get("AGENT_SERVICE_ACCOUNT")
-        if agent_service_account:
-            import subprocess
+        with _cache_lock:
+            cached = _token_cache.get(audience_url)
+            if cached and cached[1] - time.time() > _TOKEN_EXPIRY_MARGIN_SECONDS:
+                return f"Bearer {cached[0].token}"
+
+            impersonate = bool(_agent_service_account)
+            if cached:
+                credentials = cached[0]
+            else:
+                credentials = _create_id_token_credentials(audience_url, impersonate)
+
             try:
-                result = subprocess.run(
-                    [
-                        "gcloud",
-                        "auth",
-                        "print-identity-token",
-                        f"--impersonate-service-account={agent_service_account}",
-                        f"--audiences={audience_url}",
-                    ],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                token = result.stdout.strip()
-                return f"Bearer {token}"
-            except subprocess.CalledProcessError:
+                credentials.refresh(_AUTH_REQ)
+            except RefreshError:
+                if not impersonate:
+                    raise
                 # Fall through to default credentials if impersonation fails
-                pass
-        
-        # Default behavior for Cloud Run or when impersonation is not configured
-        credentials, project = google.auth.default()
-        auth_req = Request()
-        credentials.refresh(auth_req)
-        token = id_token.fetch_id_token(auth_req, audience_url)
-        return f"Bearer {token}"
+                credentials = _create_id_token_credentials(audience_url, impersonate=False)
+                credentials.refresh(_AUTH_REQ)
+
+            _token_cache[audience_url] = (credentials, _expiry_timestamp(credentials))
+            _start_refresher()
+            return f"Bearer {credentials.token}"
     except DefaultCredentialsError as exc:
         raise DefaultCredentialsError(
             "No Application Default Credentials found. "
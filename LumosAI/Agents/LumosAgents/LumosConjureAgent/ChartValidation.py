@@ -0,0 +1,148 @@
+import json
+import logging
+import re
+from typing import Literal
+
+import msgspec
+import orjson
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# Chart Payload Schema
+# Mirrors the JSON contract in Prompts.py and the VizData type in
+# LumosApp/src/public/conjureClient.ts. Only "kind" is required, matching what
+# the client insists on; table cells may hold strings as well as numbers.
+# ============================================================================
+class Point(msgspec.Struct):
+    name: str | None = None
+    x: str | float | None = None
+    y: str | float | None = None
+    z: float | None = None
+
+
+class Series(msgspec.Struct):
+    name: str
+    data: list[Point]
+
+
+class ChartPayload(msgspec.Struct):
+    kind: Literal["line", "column", "bar", "bubble", "pie", "table", "text"]
+    title: str | None = None
+    message: str | None = None
+    labels: dict[str, str | None] | None = None
+    series: list[Series] | None = None
+
+
+# Built once: msgspec compiles the schema into the decoder, so decoding validates in a
+# single pass over the bytes without materializing intermediate dicts.
+_DECODER = msgspec.json.Decoder(ChartPayload)
+
+
+# Same extraction the browser client falls back to: a ```json fenced block, else the outermost braces
+_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
+
+
+def _recover_payload(text: str) -> bytes | None:
+    """Pull the JSON object out of a wrapped response and return it re-encoded compactly."""
+    match = _CODE_BLOCK_RE.search(text)
+    if match:
+        candidate = match.group(1)
+    else:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        candidate = text[start:end + 1]
+
+    constants = []
+
+    def parse_constant(name):
+        constants.append(name)
+        return float(name)
+
+    try:
+        # Stdlib parser on this slow path: it also accepts NaN/Infinity, which orjson rejects
+        payload = json.loads(candidate, parse_constant=parse_constant)
+        recovered = orjson.dumps(payload)
+    except (ValueError, TypeError):
+        return None
+    if constants:
+        # JSON has no NaN/Infinity; orjson writes them as null. Say so rather than hide it.
+        logger.warning(
+            "LumosConjure response contained %s; replaced with null", ", ".join(sorted(set(constants)))
+        )
+    return recovered
+
+
+def _response_text(llm_response) -> str | None:
+    """Return the model's answer text, or None for tool calls and partial chunks."""
+    if llm_response.partial or not llm_response.content or not llm_response.content.parts:
+        return None
+    # Text alongside a function call is the model narrating its next step, not the final payload
+    if any(part.function_call for part in llm_response.content.parts):
+        return None
+    texts = [part.text for part in llm_response.content.parts if part.text and not part.thought]
+    return "".join(texts) if texts else None
+
+
+def _unwrap_response(llm_response, text: str):
+    """
+    Replace a payload wrapped in markdown or commentary with the bare compact JSON, but only
+    when the extracted payload matches the chart schema.
+    """
+    recovered = _recover_payload(text)
+    if recovered is None:
+        logger.warning("LumosConjure response is not valid JSON (%d bytes)", len(text))
+        return None
+
+    try:
+        _DECODER.decode(recovered)
+    except msgspec.ValidationError as exc:
+        # Only swap in payloads the client can render; otherwise leave the response as it was
+        logger.warning("LumosConjure response does not match the chart schema: %s", exc)
+        return None
+
+    # Replace the answer text with the bare payload, keeping thought parts (and their
+    # thought_signature) where they were
+    payload_text = recovered.decode()
+    parts = []
+    replaced = False
+    for part in llm_response.content.parts:
+        if not part.text or part.thought:
+            parts.append(part)
+        elif not replaced:
+            parts.append(types.Part(text=payload_text))
+            replaced = True
+    llm_response.content.parts = parts
+    return llm_response
+
+
+# ============================================================================
+# Response Validation Callback
+# ============================================================================
+def validate_chart_payload_callback(callback_context, llm_response):
+    """
+    Check the final model response against the chart payload schema.
+    Well-formed JSON is passed through untouched, without being re-serialized. A payload
+    wrapped in markdown or commentary is unwrapped and replaced with compact JSON.
+    Schema mismatches are only logged, so prompt regressions show up in the service
+    logs rather than only as client-side render errors.
+    """
+    text = _response_text(llm_response)
+    if text is None:
+        return None
+
+    raw = text.encode().strip()
+    if not (raw.startswith(b"{") and raw.endswith(b"}")):
+        return _unwrap_response(llm_response, text)
+
+    try:
+        _DECODER.decode(raw)
+    except msgspec.ValidationError as exc:
+        logger.warning("LumosConjure response does not match the chart schema: %s", exc)
+    except msgspec.DecodeError as exc:
+        # Bare but malformed (e.g. truncated, or NaN values): forward it unchanged so the
+        # model's error stays visible instead of being papered over.
+        logger.warning("LumosConjure response is not valid JSON: %s", exc)
+    return None
@@ -1,8 +1,45 @@
+import httpx
+import logging
 import os
 from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPConnectionParams
 from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
 from .AuthHelper import get_id_token_for_service
 
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# MCP Connection Settings
+# ============================================================================
+# Reuse each server's tools/list response instead of re-listing on every agent turn.
+# Tool definitions only change when a tool service is redeployed.
+TOOL_LIST_CACHE_TTL_SECONDS = 300
+
+
+def create_mcp_http_client(headers=None, timeout=None, auth=None) -> httpx.AsyncClient:
+    """
+    Create the HTTP client for an MCP session with HTTP/2 enabled, so concurrent tool
+    calls multiplex over one kept-alive connection. ADK always passes the timeout, built
+    from the connection params' timeout and sse_read_timeout.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        headers=headers,
+        timeout=timeout,
+        auth=auth,
+        follow_redirects=True,
+    )
+
+
+def _make_header_provider(service_name: str, audience_url: str):
+    """Build an MCP header_provider that generates auth headers for the given service."""
+    def provider(context):
+        try:
+            return {"Authorization": get_id_token_for_service(audience_url)}
+        except Exception:
+            logger.exception("Failed to fetch ID token for %s at (%s)", service_name, audience_url)
+            return {}
+    return provider
+
 
 # ============================================================================
 # LumosDB Tool Configuration
@@ -16,20 +53,14 @@ if not lumosdb_service_url:
 lumosdb_service_url_mcp = lumosdb_service_url.rstrip('/') + "/mcp"
 
 
-def get_lumosdb_auth_headers(context):
-    """Generate auth headers for LumosDB service."""
-    try:
-        return {"Authorization": get_id_token_for_service(lumosdb_service_url)}
-    except Exception as e:
-        print(f"Failed to fetch ID token for LumosDB at ({lumosdb_service_url}): {e}")
-        return {}
-
-
 # Create the toolset
 lumosdb_toolset = McpToolset(
     connection_params=StreamableHTTPConnectionParams(
         url=lumosdb_service_url_mcp,
+        httpx_client_factory=create_mcp_http_client,
     ),
-    # Use "header_provider" instead of "header" here so we can automatically re-auth if the token expires (hourly)
-    header_provider=get_lumosdb_auth_headers
+    tool_list_cache_ttl_seconds=TOOL_LIST_CACHE_TTL_SECONDS,
+    # Use "header_provider" instead of "header" here so we can automatically re-auth if the token expires (hourly).
+    # The token is cached until it nears expiry, so headers stay stable and ADK keeps reusing the same MCP session.
+    header_provider=_make_header_provider("LumosDB", lumosdb_service_url)
 )
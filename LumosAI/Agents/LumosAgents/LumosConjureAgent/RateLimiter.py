@@ -0,0 +1,43 @@
+import asyncio
+import collections
+import time
+
+
+# ============================================================================
+# Sliding Window Rate Limiter
+# ============================================================================
+class SlidingWindowLimiter:
+    """
+    Allow at most `limit` calls in any `window`-second span.
+    Callers only wait when the window is full, instead of paying a fixed delay per call.
+
+    Not thread-safe by design: it is only used from the event loop, and _reserve() never
+    awaits, so each reservation is atomic with respect to other coroutines and needs no lock.
+    """
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        # Start times of the most recent `limit` calls, oldest first. Times may be in the
+        # future for callers still waiting on their slot; maxlen drops the oldest on append.
+        self._calls: collections.deque[float] = collections.deque(maxlen=limit)
+
+    def _reserve(self) -> float:
+        """Claim the next free slot and return how many seconds the caller must wait for it."""
+        now = time.monotonic()
+        slot = now
+        if len(self._calls) == self.limit:
+            # Full window: the caller may start once the oldest of the last `limit` calls ages out
+            slot = max(now, self._calls[0] + self.window)
+        self._calls.append(slot)
+        return slot - now
+
+    async def acquire(self):
+        """Wait until the call fits in the window, without blocking the event loop."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Shared by every model call in this agent: at most 10 calls in any one-second window.
+MODEL_CALL_LIMITER = SlidingWindowLimiter(limit=10, window=1.0)
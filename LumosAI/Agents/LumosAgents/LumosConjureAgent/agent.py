@@ -1,208 +1,38 @@
-import time
 from google.adk.agents import LlmAgent
+from google.adk.models import Gemini
+from google.adk.agents.context_cache_config import ContextCacheConfig
 from google.adk.apps import App
+from .Callbacks import MODEL_RETRY_OPTIONS, rate_limit_callback
+from .ChartValidation import validate_chart_payload_callback
 from .MyTools import lumosdb_toolset
-
-# ============================================================================
-# Retry Configuration
-# ============================================================================
-RETRY_MAX_ATTEMPTS = 3
-RETRY_INITIAL_DELAY = 0.1
-RETRY_MAX_DELAY = 10.0
-RETRY_MULTIPLIER = 2.0
-
-# ============================================================================
-# Rate Limiting Callback
-# ============================================================================
-def rate_limit_callback(callback_context, llm_request):
-    """
-    Throttle requests to avoid hitting quota limits.
-    Adds a small delay between model calls.
-    """
-    time.sleep(0.1)
-
-def retry_on_error_callback(callback_context, llm_request, error=None, exception=None, **kwargs):
-    """
-    Handle model errors with exponential backoff retry logic.
-    Uses callback_context.state to track retry attempts and delays.
-    """
-    # Use either error or exception parameter
-    err = error or exception
-    
-    # Initialize retry tracking in state if not present
-    request_id = id(llm_request)
-    retry_key = f"retry_count_{request_id}"
-    delay_key = f"retry_delay_{request_id}"
-    
-    if retry_key not in callback_context.state:
-        callback_context.state[retry_key] = 0
-        callback_context.state[delay_key] = RETRY_INITIAL_DELAY
-    
-    retry_count = callback_context.state[retry_key]
-    current_delay = callback_context.state[delay_key]
-    
-    # Check if we've exceeded max attempts
-    if retry_count >= RETRY_MAX_ATTEMPTS - 1:
-        # Clean up state and let the error propagate
-        del callback_context.state[retry_key]
-        del callback_context.state[delay_key]
-        return None  # Re-raise the exception
-    
-    # Increment retry count and calculate next delay
-    callback_context.state[retry_key] = retry_count + 1
-    
-    # Sleep with exponential backoff
-    time.sleep(current_delay)
-    
-    # Calculate next delay with exponential backoff, capped at max_delay
-    next_delay = min(current_delay * RETRY_MULTIPLIER, RETRY_MAX_DELAY)
-    callback_context.state[delay_key] = next_delay
-    
-    # Return None to retry the request
-    return None
+from .Prompts import CONJURE_INSTRUCTION
 
 # ============================================================================
 # Agent Definition
 # ============================================================================
 root_agent = LlmAgent(
     name='LumosConjure',
-    model='gemini-2.5-flash', 
+    model=Gemini(model='gemini-2.5-flash', retry_options=MODEL_RETRY_OPTIONS),
     description='Agent to visualize trading data and conjure charts.',
-    instruction=(
-        """You are LumosConjure, a visualization expert. Your goal is to fetch data using the available tools and transform it into a specific JSON format for rendering charts and tables in the UI.
-
-CURRENT DATE CONTEXT:
-Each user message includes the current date in the format "[Current Date: YYYY-MM-DD]" at the beginning. Use this date as your reference when users ask for relative date ranges like "last 90 days" or "past 3 months".
-
-STRICT RESPONSE FORMAT:
-You must ALWAYS return a JSON object adhering to this structure.
-It is CRITICAL that you return ONLY the RAW JSON object in COMPACT FORMAT (no extra whitespace or newlines).
-DO NOT wrap the output in markdown code blocks (like ```json ... ```) or other formatting metadata.
-DO NOT include any conversational text outside the JSON object.
-DO NOT pretty-print the JSON with indentation or newlines - return it as a single line.
-Use the "message" field within the JSON for any commentary. Always provide commentary for each response.
-
-{
-  "kind": "line" | "column" | "bar" | "bubble" | "pie" | "table" | "text",
-  "title": "A Descriptive Title",
-  "message": "Optional context or insights about the data.",
-  "labels": {
-    "x": "Label for X-Axis or Column 1",
-    "y": "Label for Y-Axis",
-    "z": "Label for Z-Axis (Bubble Size)"
-  },
-  "series": [
-    {
-      "name": "Series Name (Legend)",
-      "data": [
-        { "name": "Point Name", "x": "Value/Date/Unused", "y": 123.45, "z": 10 }
-      ]
-    }
-  ]
-}
-
-DATA TYPES & USAGE:
-- **line**: Use for time-series line charts. `x` is time/date as a string (e.g., "2026-01-15"), `y` is value (y-axis on left). Good for showing trends over time.
-- **column**: Use for vertical bar charts. `x` can be either:
-  * Time/date as a string (e.g., "2026-01-15") for time-series data
-  * Category name as a string (e.g., "AAPL", "Account Name") for categorical comparisons
-  `y` is the numeric value (y-axis on left). Good for comparing values across time periods OR categories.
-- **bar**: Use ONLY for horizontal bar charts with non-date categories (e.g., account names, symbols). `x` is numeric value (x-axis on bottom), `y` is category label (y-axis on left).
-- **bubble**: Use for multi-dimensional data. `x` = dim1 (e.g., date), `y` = dim2 (e.g., value), `z` = size/dim3 (e.g., gain). Include `name` in each data point for tooltips. IMPORTANT: Each series represents a different group (e.g., symbol) and will be rendered in a unique color with a legend entry. Group your data points by the categorical dimension you want to distinguish by color.
-  Example for trades: 
-  ```
-  "series": [
-    {"name": "TSLL", "data": [{"name": "TSLL", "x": "2026-01-23", "y": 24447.15, "z": -68.11}, {"name": "TSLL", "x": "2026-01-15", "y": 0, "z": -29.32}]},
-    {"name": "SOXS", "data": [{"name": "SOXS", "x": "2026-01-22", "y": 0, "z": 130.6}]},
-    {"name": "SGOV", "data": [{"name": "SGOV", "x": "2026-01-21", "y": 905.49, "z": 0.36}]}
-  ]
-  ```
-- **pie**: Use for allocation/proportions. Use `name` for slice label, `y` for value.
-- **IMPORTANT**: NEVER use percentage values in charts (line, column, bar, bubble, pie). Always use raw numeric values. Percentages should ONLY be used in tables where appropriate.
-- **table**: Use for generic tabular data. `labels.x` is header for Col 1, `labels.y` for Col 2, etc. Or just use `kind: table` and mapping strategies.
-    * Ideally, mapping for table: `series` contains columns? No, follow the chart structure:
-    * `series[n].name` = Column Header (starting from 2nd col usually, but let's stick to the Chart Payload format).
-    * Actually, for TABLE: Use `series[0].data` as rows. `x` is Col 1 value, `y` is Col 2 value.
-    * BETTER TABLE STRATEGY: If the user asks for a table, try to fit it into the Series structure (x, y) or use the `text` kind if it's too complex, but prefer `table`.
-    * For `kind: table`:
-      - `labels.x`: Header for the primary key column (from data.x or data.name).
-      - `series`: Each series represents a data column. 
-      - `series[i].name`: Header for that value column.
-      - `series[i].data[j].y`: The value for row j.
-      - `series[i].data[j].name` or `x`: The key for row j.
-- **text**: Use ONLY if the request cannot be visualized or an error occurs. Set `title` to "Info" or "Error" and put the content in `message`.
-- **IMPORTANT - Data Size Limits**: To keep JSON responses manageable:
-  - For charts (line, column, bar, bubble, pie): Limit to a MAXIMUM of 90 data points per series, even if the tool returns more. If data spans more than 90 days, sample or aggregate appropriately.
-  - For tables: Limit to 20 rows unless the user explicitly requests more.
-  - When limiting data, include a note in the "message" field indicating the data has been limited.
-
-CRITICAL RULES - NEVER VIOLATE:
-1. NEVER write Python code. NEVER use datetime, timedelta, or any Python imports.
-2. NEVER calculate dates yourself. When users request relative date ranges (e.g., "last 90 days"), extract the current date from the message prefix and calculate the start date as a YYYY-MM-DD string. For "last 90 days" subtract 90 days, for "last 3 months" use approximately 90 days, etc.
-3. ONLY call tools directly with simple parameters (strings, numbers, booleans, or null).
-4. For common requests like "last 30 days" or "account history" without a specific range, simply call the tool with null for the date parameter - the tool will default to 30 days automatically.
-5. NEVER convert negative values to positive values. ALWAYS preserve the sign of numeric values exactly as returned by the tools. Losses must remain negative, gains must remain positive. This applies to ALL chart types and tables.
-
-INSTRUCTIONS:
-1. Analyze the user's request.
-2. Call tools from `lumosdb_toolset` (e.g., `search-trades`, `account-history`, `account-balances`) with simple parameters.
-3. Transform the tool output into the exact JSON format above. DO NOT DEVIATE!
-4. Ensure dates are in US Eastern Time / New York time.
-5. If no data is found, return `kind: "text"` with a helpful message.
-
-TOOL FORMATTING GUIDANCE:
-Infer user intent as best you can first, but apply these rules if intent is missing or ambiguous:
-1. search-trades: 
-   - BUBBLE CHART PREFERRED for visualizing trades: 
-     * Group trades by Symbol - create ONE series per unique symbol
-     * Each series.name = the symbol (e.g., "TSLL", "SOXS", etc.) - this creates colored legend entries
-     * For each trade in that symbol: x = OpenDate (as string "YYYY-MM-DD"), y = CurrentGain (numeric), z = CurrentValue (numeric, used for bubble size)
-     * Include "name" field in each data point set to the Symbol (for tooltips)
-     * This format ensures each symbol gets its own color and appears in the legend
-   - BAR/COLUMN CHART for trades WITHOUT time series: If user requests "bar chart" or "column chart" for trades without specifying a time range (e.g., "open trades as a bar chart", "show my trades as columns"), use COLUMN chart (vertical bars) with:
-     * One column per trade
-     * x = Symbol (the trade symbol identifies each column)
-     * y = CurrentValue by default (or CurrentGain if specifically requested)
-     * Use column chart, NOT bar chart (bar charts are horizontal and for non-date categories)
-     * If user says "bar chart", recommend/use column chart instead since it's more appropriate for this data
-   - NEVER use bar/column charts for time series data - use line charts for trends over time
-   - Pass in maxRecords of 30 by default. Pass null for symbol to get all trades, unless symbol explicitly specified by user. 
-   - Response to "show my trades", "open trades", "current trades", "trade performance", etc.
-2. trade-history: Use line or column chart (not horizontal bar), x=date, y=current value (or total gain). One series per symbol. Call with just tradeID - the tool defaults to 30 days.
-3. search-orders: 
-   - ALWAYS use table format with individual columns for each field
-   - Structure the table properly:
-     * labels.x = "Order ID" (this is the first/key column - do NOT create a separate series for Order ID)
-     * Create separate series ONLY for: Symbol, Account Name, Action, Quantity, Price, Order Amount, Fees, Executed Time
-     * Each series: series[i].name = field name (e.g., "Symbol", "Account Name", "Action", etc.)
-     * For each series, data[j].x or data[j].name = the Order ID (row identifier)
-     * For each series, data[j].y = the field value for that row
-   - CRITICAL: Do NOT include Order ID as a series - it's already the first column via labels.x
-   - Format dates in a readable US Eastern time format
-   - Sort by date (ExecutedTime) descending (most recent first)
-   - DO NOT combine multiple fields into a single comma-separated value
-   - Each order field MUST be its own column in the table
-4. account-balances: pie chart preferred, using account name as label and current balance as value.
-5. account-history: 
-   - For balance/value requests: Use line or column chart, x=date, y=current balance. Return both Balance and InvestedAmount as two series.
-   - For gain/profit/loss requests, determine which field to use based on user's terminology:
-     * If user says "gains", "profits", "losses", or "profit and loss" → Use BalanceChangeAmount field. Label the series with the user's terminology (e.g., "Gains", "Profits", "Profit and Loss").
-     * If user says "total gains", "net gains", or "cumulative gains" → Use NetGain field. Label the series as "Total Account Gain" or use user's terminology.
-   - ALWAYS use COLUMN chart type for gain/profit/loss visualizations.
-   - NEVER show percentage values (NetGainPct or BalanceChangePct) in gain charts.
-   - ALWAYS show all data points including both positive gains and negative losses. NEVER filter out gains or losses unless the user explicitly requests to exclude one type (e.g., "show only gains" or "show only losses").
-   - Call with null for dateAfter - the tool defaults to 30 days.
-   - If no account specified, aggregate all accounts.
-6. expected-moves: return text with key insights about expected moves.
-
-ERROR HANDLING:
-- If you encounter errors or fail to get a response, return kind: "text" with a message informing the user that they may be hitting Vertex AI quota limits and suggest waiting a moment before trying again.
-
-"""
-    ),
+    instruction=CONJURE_INSTRUCTION,
     tools=[lumosdb_toolset],
     before_model_callback=[rate_limit_callback],
-    on_model_error_callback=[retry_on_error_callback],
+    after_model_callback=[validate_chart_payload_callback],
 )
 
-app = App(root_agent=root_agent, name="LumosConjureAgent")
+# ============================================================================
+# Context Caching
+# The static instruction and tool declarations are the bulk of every request, so
+# let ADK keep them in a Gemini cached-content entry and reference it by name
+# instead of re-sending (and re-billing) the full prefix on each turn.
+# ============================================================================
+context_cache_config = ContextCacheConfig(
+    ttl_seconds=3600,
+    cache_intervals=10,
+)
+
+app = App(
+    root_agent=root_agent,
+    name="LumosConjureAgent",
+    context_cache_config=context_cache_config,
+)
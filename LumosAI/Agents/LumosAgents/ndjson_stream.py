@@ -0,0 +1,67 @@
+# Copyright 2026 Mark Isham
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from google.adk.cli.adk_web_server import RunAgentRequest
+
+_SSE_DATA_PREFIX = b"data: "
+
+
+async def _sse_to_ndjson(body_iterator: AsyncIterator[str | bytes]) -> AsyncIterator[bytes]:
+    """Re-frame ADK's SSE events ("data: {...}\\n\\n") as one JSON object per line."""
+    async for chunk in body_iterator:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        for line in chunk.splitlines():
+            # ADK already serialized each event, so pass the JSON through untouched
+            if line.startswith(_SSE_DATA_PREFIX):
+                yield line[len(_SSE_DATA_PREFIX):] + b"\n"
+
+
+def add_ndjson_stream_route(app: FastAPI) -> None:
+    """
+    Register POST /run_stream: the same request body and agent run as ADK's /run_sse,
+    but streamed as application/x-ndjson so events (including partial model text when
+    "streaming" is true) reach the client as they are generated, instead of /run
+    buffering every event of the turn into one JSON array.
+
+    The run itself is delegated to ADK's /run_sse handler, so runner, session and
+    validation behavior (e.g. 404 for an unknown session) stay identical.
+    """
+    run_sse = next(
+        (
+            route.endpoint
+            for route in app.routes
+            if isinstance(route, APIRoute) and route.path == "/run_sse"
+        ),
+        None,
+    )
+    if run_sse is None:
+        raise RuntimeError(
+            "ADK's /run_sse route was not found on the app; /run_stream delegates to it. "
+            "Check whether the installed google-adk version still registers it."
+        )
+
+    @app.post("/run_stream")
+    async def run_stream(req: RunAgentRequest) -> StreamingResponse:
+        sse_response = await run_sse(req)
+        return StreamingResponse(
+            _sse_to_ndjson(sse_response.body_iterator),
+            media_type="application/x-ndjson",
+            background=sse_response.background,
+        )
@@ -0,0 +1,72 @@
+# Copyright 2026 Mark Isham
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import orjson
+
+_stdlib_dumps = json.dumps
+_stdlib_loads = json.loads
+
+# json.dumps keyword arguments orjson can honor. Anything else (indent, separators, cls, ...),
+# and an explicit ensure_ascii=True, goes to the stdlib.
+_ORJSON_DUMPS_KWARGS = frozenset({"default", "sort_keys", "ensure_ascii"})
+
+# Hand datetimes and dataclasses to `default` as the stdlib does, instead of orjson's built-in
+# encodings, so objects the stdlib can't serialize still raise TypeError.
+_ORJSON_DUMPS_OPTION = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
+def _orjson_dumps(obj, *args, **kwargs):
+    if args or kwargs.keys() - _ORJSON_DUMPS_KWARGS or kwargs.get("ensure_ascii"):
+        return _stdlib_dumps(obj, *args, **kwargs)
+    option = _ORJSON_DUMPS_OPTION
+    if kwargs.get("sort_keys"):
+        option |= orjson.OPT_SORT_KEYS
+    try:
+        return orjson.dumps(obj, default=kwargs.get("default"), option=option).decode()
+    except TypeError:
+        # Values orjson rejects but the stdlib accepts (e.g. integers wider than 64 bits)
+        return _stdlib_dumps(obj, **kwargs)
+
+
+def _orjson_loads(s, *args, **kwargs):
+    if args or kwargs:
+        return _stdlib_loads(s, *args, **kwargs)
+    try:
+        return orjson.loads(s)
+    except orjson.JSONDecodeError:
+        # The stdlib also accepts NaN/Infinity, and raises the usual error for invalid input
+        return _stdlib_loads(s)
+
+
+def install_orjson_json_hooks() -> None:
+    """
+    Route json.dumps/json.loads through orjson for every module that calls them via the
+    json module (ADK tool payloads, session state, etc.).
+
+    Output is still valid JSON but not byte-identical to the stdlib's, and a few values
+    are handled differently:
+    - output is compact, and non-ASCII characters are emitted as UTF-8 rather than
+      escaped (unless the caller passes ensure_ascii=True);
+    - NaN and Infinity are written as null instead of the stdlib's non-standard NaN/Infinity;
+    - plain Enum members and UUIDs serialize natively where the stdlib raises TypeError.
+
+    Install before importing ADK: modules that do `from json import dumps` bind whichever
+    function exists at their import time.
+    """
+    json.dumps = _orjson_dumps
+    json.loads = _orjson_loads
@@ -21,6 +21,9 @@ root_agent = LlmAgent(
         McpToolset(
             connection_params=StreamableHTTPConnectionParams(
                 url=mcp_url,
+                # ADK builds the client's httpx.Timeout from these two fields
+                timeout=30.0,
+                sse_read_timeout=300.0,
             )
         )
     ],